@@ -6,8 +6,8 @@
 """Charm for Synapse on kubernetes."""
 
 
+import functools
 import logging
-import re
 import typing
 
 import ops
@@ -37,6 +37,8 @@ logger = logging.getLogger(__name__)
 
 MAIN_UNIT_ID = "main_unit_id"
 INGRESS_INTEGRATION_NAME = "ingress"
+# marks a memoized value that has not been computed yet, as None is a valid value
+_UNSET = object()
 
 
 class SynapseCharm(CharmBaseWithState):
@@ -58,6 +60,12 @@ class SynapseCharm(CharmBaseWithState):
             args: class arguments.
         """
         super().__init__(*args)
+        self._main_unit_cache: typing.Optional[str] = None
+        self._main_unit_addr_cache: typing.Optional[str] = None
+        self._signing_key_cache: object = _UNSET
+        self._peer_units_total_cache: typing.Optional[int] = None
+        self._last_reconcile_key: typing.Optional[typing.Tuple] = None
+        self._last_nginx_main: typing.Optional[str] = None
         self._backup = BackupObserver(self)
         self._matrix_auth = MatrixAuthObserver(self)
         self._media = MediaObserver(self)
@@ -98,6 +106,34 @@ class SynapseCharm(CharmBaseWithState):
         )
         self.framework.observe(self.on.anonymize_user_action, self._on_anonymize_user_action)
 
+    def reset_caches(self) -> None:
+        """Drop values memoized while handling a previous event."""
+        self._main_unit_cache = None
+        self._main_unit_addr_cache = None
+        self._signing_key_cache = _UNSET
+        self._peer_units_total_cache = None
+        self._last_reconcile_key = None
+        self.__dict__.pop("_peer_relation", None)
+
+    @functools.cached_property
+    def container(self) -> ops.Container:
+        """Get the Synapse container.
+
+        Returns:
+            The Synapse workload container.
+        """
+        return self.unit.get_container(synapse.SYNAPSE_CONTAINER_NAME)
+
+    @functools.cached_property
+    def _peer_relation(self) -> typing.Optional[ops.Relation]:
+        """Get the Synapse peer relation.
+
+        Returns:
+            The peer relation or None if it does not exist yet.
+        """
+        peer_relations = self.model.relations[synapse.SYNAPSE_PEER_RELATION_NAME]
+        return peer_relations[0] if peer_relations else None
+
     def build_charm_state(self) -> CharmState:
         """Build charm state.
 
@@ -134,15 +170,26 @@ class SynapseCharm(CharmBaseWithState):
         """
         if not unit_name:
             unit_name = self.unit.name
-        unit_part = unit_name.split(".")[0]
-        index = unit_part.rfind("/")  # synapse/0 pattern
-        if index == -1:
-            index = unit_part.rfind("-")  # synapse-0 pattern
-        begin = index + 1
-        unit_id = unit_part[begin:]
+        unit_id = self._parse_unit_number(unit_name)
         logger.debug("Unit id from %s is %s", unit_name, unit_id)
         return unit_id
 
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _parse_unit_number(unit_name: str) -> str:
+        """Parse unit number from unit name.
+
+        Args:
+            unit_name: unit name or address. E.g.: synapse/0 or synapse-0.synapse-endpoints.
+
+        Returns:
+            Unit number. E.g.: 0
+        """
+        unit_part = unit_name.split(".", 1)[0]
+        if "/" in unit_part:
+            return unit_part.rpartition("/")[2]  # synapse/0 pattern
+        return unit_part.rpartition("-")[2]  # synapse-0 pattern
+
     def instance_map(self) -> typing.Optional[typing.Dict]:
         """Build instance_map config.
 
@@ -152,38 +199,37 @@ class SynapseCharm(CharmBaseWithState):
         if self.peer_units_total() == 1:
             logger.debug("Only 1 unit found, skipping instance_map.")
             return None
-        unit_name = self.unit.name.replace("/", "-")
-        app_name = self.app.name
-        addresses = [f"{unit_name}.{app_name}-endpoints"]
-        peer_relation = self.model.relations[synapse.SYNAPSE_PEER_RELATION_NAME]
-        if peer_relation:
-            relation = peer_relation[0]
-            # relation.units will contain the units after the relation-joined event.
-            # since a relation-changed is emitted for every relation-joined event,
-            # the relation-changed handler will reconcile the configuration and
-            # instance_map will be properly set.
-            for u in relation.units:
-                # <unit-name>.<app-name>-endpoints.<model-name>.svc.cluster.local
-                unit_name = u.name.replace("/", "-")
-                address = f"{unit_name}.{app_name}-endpoints"
-                addresses.append(address)
-        logger.debug("addresses values are: %s", str(addresses))
+        suffix = f"{self.app.name}-endpoints"
+        relation = self._peer_relation
+        # relation.units will contain the units after the relation-joined event.
+        # since a relation-changed is emitted for every relation-joined event,
+        # the relation-changed handler will reconcile the configuration and
+        # instance_map will be properly set.
+        peer_units = relation.units if relation is not None else ()
+        # A Juju unit name is s always named on the
+        # pattern <application>/<unit ID>, where <application> is the name
+        # of the application and the <unit ID> is its ID number.
+        # https://juju.is/docs/juju/unit
+        # <unit-name>.<app-name>-endpoints.<model-name>.svc.cluster.local
+        entries = [
+            (self._parse_unit_number(u.name), f"{u.name.replace('/', '-')}.{suffix}")
+            for u in [self.unit, *peer_units]
+        ]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("addresses values are: %s", [address for _, address in entries])
+        main_addr = self.get_main_unit_address()
         instance_map = {
-            "main": {"host": self.get_main_unit_address(), "port": 8035},
-            "federationsender1": {"host": self.get_main_unit_address(), "port": 8034},
+            "main": {"host": main_addr, "port": 8035},
+            "federationsender1": {"host": main_addr, "port": 8034},
         }
-        for address in addresses:
-            match = re.search(r"-(\d+)", address)
-            # A Juju unit name is s always named on the
-            # pattern <application>/<unit ID>, where <application> is the name
-            # of the application and the <unit ID> is its ID number.
-            # https://juju.is/docs/juju/unit
-            if address == self.get_main_unit_address():
-                continue
-            unit_number = match.group(1)  # type: ignore[union-attr]
-            instance_name = f"worker{unit_number}"
-            instance_map[instance_name] = {"host": address, "port": 8034}
-        logger.debug("instance_map is: %s", str(instance_map))
+        instance_map.update(
+            {
+                f"worker{unit_number}": {"host": address, "port": 8034}
+                for unit_number, address in entries
+                if address != main_addr
+            }
+        )
+        logger.debug("instance_map is: %s", instance_map)
         return instance_map
 
     def reconcile(self, charm_state: CharmState) -> None:
@@ -194,31 +240,49 @@ class SynapseCharm(CharmBaseWithState):
         Args:
             charm_state: Instance of CharmState
         """
-        if self.get_main_unit() is None and self.unit.is_leader():
+        main_unit = self.get_main_unit()
+        if main_unit is None and self.unit.is_leader():
             logging.debug("Change_config is setting main unit.")
             self.set_main_unit(self.unit.name)
-        container = self.unit.get_container(synapse.SYNAPSE_CONTAINER_NAME)
+            main_unit = self.get_main_unit()
+        is_main = main_unit == self.unit.name
+        main_addr = self.get_main_unit_address()
+        container = self.container
         if not container.can_connect():
             self.unit.status = ops.MaintenanceStatus("Waiting for Synapse pebble")
             return
+        signing_key_from_secret = self.get_signing_key()
+        # the same event may ask for the same reconciliation more than once
+        reconcile_key = (
+            charm_state,
+            is_main,
+            main_addr,
+            self.unit.is_leader(),
+            signing_key_from_secret,
+        )
+        # a Blocked unit must be reconciled again to clear its status
+        if (
+            reconcile_key == self._last_reconcile_key
+            and not isinstance(self.unit.status, ops.BlockedStatus)
+            and self._is_workload_running(container)
+        ):
+            logger.debug("Nothing changed since last reconcile, skipping")
+            self._set_unit_status()
+            return
         self.model.unit.status = ops.MaintenanceStatus("Configuring Synapse")
         try:
             # check signing key
             signing_key_path = f"/data/{charm_state.synapse_config.server_name}.signing.key"
-            signing_key_from_secret = self.get_signing_key()
             if signing_key_from_secret:
-                logger.debug("Signing key secret was found, pushing it to the container")
-                container.push(
-                    signing_key_path, signing_key_from_secret, make_dirs=True, encoding="utf-8"
-                )
+                self._push_signing_key(container, signing_key_path, signing_key_from_secret)
 
             # reconcile configuration
             pebble.reconcile(
-                charm_state, container, is_main=self.is_main(), unit_number=self.get_unit_number()
+                charm_state, container, is_main=is_main, unit_number=self.get_unit_number()
             )
 
             # create new signing key if needed
-            if self.is_main() and not signing_key_from_secret:
+            if is_main and not signing_key_from_secret:
                 logger.debug("Signing key secret not found, creating secret")
                 with container.pull(signing_key_path) as f:
                     signing_key = f.read()
@@ -230,9 +294,62 @@ class SynapseCharm(CharmBaseWithState):
         except (pebble.PebbleServiceError, FileNotFoundError) as exc:
             self.model.unit.status = ops.BlockedStatus(str(exc))
             return
-        pebble.restart_nginx(container, self.get_main_unit_address())
+        # pebble.reconcile does not touch NGINX, its service is only checked when
+        # it was already configured with this main unit address
+        if main_addr != self._last_nginx_main or not self._is_nginx_running(container):
+            pebble.restart_nginx(container, main_addr)
+            self._last_nginx_main = main_addr
+        self._last_reconcile_key = reconcile_key
         self._set_unit_status()
 
+    def _push_signing_key(
+        self, container: ops.Container, signing_key_path: str, signing_key: str
+    ) -> None:
+        """Push the signing key to the container unless it is already there.
+
+        Args:
+            container: Synapse container.
+            signing_key_path: path of the signing key file.
+            signing_key: signing key as string.
+        """
+        try:
+            with container.pull(signing_key_path) as f:
+                if f.read().rstrip() == signing_key.rstrip():
+                    logger.debug("Signing key in the container matches the secret")
+                    return
+        except ops.pebble.PathError:
+            logger.debug("Signing key not found in the container")
+        logger.debug("Signing key secret was found, pushing it to the container")
+        container.push(signing_key_path, signing_key, make_dirs=True, encoding="utf-8")
+
+    def _is_workload_running(self, container: ops.Container) -> bool:
+        """Check if Synapse and NGINX services are running.
+
+        Args:
+            container: Synapse container.
+
+        Returns:
+            True if both services exist and are running.
+        """
+        services = container.get_services(
+            synapse.SYNAPSE_SERVICE_NAME, synapse.SYNAPSE_NGINX_SERVICE_NAME
+        )
+        return len(services) == 2 and all(service.is_running() for service in services.values())
+
+    def _is_nginx_running(self, container: ops.Container) -> bool:
+        """Check if NGINX service is running.
+
+        Args:
+            container: Synapse container.
+
+        Returns:
+            True if the service exists and is running.
+        """
+        service = container.get_services(synapse.SYNAPSE_NGINX_SERVICE_NAME).get(
+            synapse.SYNAPSE_NGINX_SERVICE_NAME
+        )
+        return service is not None and service.is_running()
+
     def _set_unit_status(self) -> None:
         """Set unit status depending on Synapse and NGINX state."""
         # This method contains a similar check that the one in mjolnir.py for Synapse
@@ -245,23 +362,20 @@ class SynapseCharm(CharmBaseWithState):
         if isinstance(self.unit.status, ops.BlockedStatus):
             return
         # Synapse checks
-        container = self.unit.get_container(synapse.SYNAPSE_CONTAINER_NAME)
+        container = self.container
         if not container.can_connect():
             self.unit.status = ops.MaintenanceStatus("Waiting for Synapse pebble")
             return
-        synapse_service = container.get_services(synapse.SYNAPSE_SERVICE_NAME)
-        synapse_not_active = [
-            service for service in synapse_service.values() if not service.is_running()
-        ]
-        if not synapse_service or synapse_not_active:
+        services = container.get_services(
+            synapse.SYNAPSE_SERVICE_NAME, synapse.SYNAPSE_NGINX_SERVICE_NAME
+        )
+        synapse_service = services.get(synapse.SYNAPSE_SERVICE_NAME)
+        if synapse_service is None or not synapse_service.is_running():
             self.unit.status = ops.MaintenanceStatus("Waiting for Synapse")
             return
         # NGINX checks
-        nginx_service = container.get_services(synapse.SYNAPSE_NGINX_SERVICE_NAME)
-        nginx_not_active = [
-            service for service in nginx_service.values() if not service.is_running()
-        ]
-        if not nginx_service or nginx_not_active:
+        nginx_service = services.get(synapse.SYNAPSE_NGINX_SERVICE_NAME)
+        if nginx_service is None or not nginx_service.is_running():
             self.unit.status = ops.MaintenanceStatus("Waiting for NGINX")
             return
         # All checks passed, the unit is active
@@ -269,7 +383,7 @@ class SynapseCharm(CharmBaseWithState):
 
     def _set_workload_version(self) -> None:
         """Set workload version with Synapse version."""
-        container = self.unit.get_container(synapse.SYNAPSE_CONTAINER_NAME)
+        container = self.container
         if not container.can_connect():
             self.unit.status = ops.MaintenanceStatus("Waiting for Synapse pebble")
             return
@@ -324,7 +438,9 @@ class SynapseCharm(CharmBaseWithState):
         Returns:
             total of units in peer relation or None if there is no peer relation.
         """
-        return self.app.planned_units()
+        if self._peer_units_total_cache is None:
+            self._peer_units_total_cache = self.app.planned_units()
+        return self._peer_units_total_cache
 
     @inject_charm_state
     def _on_synapse_pebble_ready(self, _: ops.HookEvent, charm_state: CharmState) -> None:
@@ -348,14 +464,17 @@ class SynapseCharm(CharmBaseWithState):
         Returns:
             main unit if main unit exists in peer relation data.
         """
-        peer_relation = self.model.relations[synapse.SYNAPSE_PEER_RELATION_NAME]
-        if not peer_relation:
+        if self._main_unit_cache is not None:
+            return self._main_unit_cache
+        peer_relation = self._peer_relation
+        if peer_relation is None:
             logger.error(
                 "Failed to get main unit: no peer relation %s found",
                 synapse.SYNAPSE_PEER_RELATION_NAME,
             )
             return None
-        return peer_relation[0].data[self.app].get(MAIN_UNIT_ID)
+        self._main_unit_cache = peer_relation.data[self.app].get(MAIN_UNIT_ID)
+        return self._main_unit_cache
 
     def get_main_unit_address(self) -> str:
         """Get main unit address. If main unit is None, use unit name.
@@ -363,11 +482,14 @@ class SynapseCharm(CharmBaseWithState):
         Returns:
             main unit address as unit-0.synapse-endpoints.
         """
+        if self._main_unit_addr_cache is not None:
+            return self._main_unit_addr_cache
         main_unit_name = self.get_main_unit()
         if main_unit_name is None:
             main_unit_name = self.unit.name
         main_unit_formatted = main_unit_name.replace("/", "-")
-        return f"{main_unit_formatted}.{self.app.name}-endpoints"
+        self._main_unit_addr_cache = f"{main_unit_formatted}.{self.app.name}-endpoints"
+        return self._main_unit_addr_cache
 
     def set_main_unit(self, unit: str) -> None:
         """Create/Renew an admin access token and put it in the peer relation.
@@ -375,15 +497,17 @@ class SynapseCharm(CharmBaseWithState):
         Args:
             unit: Unit to be the main.
         """
-        peer_relation = self.model.relations[synapse.SYNAPSE_PEER_RELATION_NAME]
-        if not peer_relation:
+        self._main_unit_cache = None
+        self._main_unit_addr_cache = None
+        peer_relation = self._peer_relation
+        if peer_relation is None:
             logger.error(
                 "Failed to get main unit: no peer relation %s found",
                 synapse.SYNAPSE_PEER_RELATION_NAME,
             )
         else:
             logging.info("Setting main unit to be %s", unit)
-            peer_relation[0].data[self.app].update({MAIN_UNIT_ID: unit})
+            peer_relation.data[self.app].update({MAIN_UNIT_ID: unit})
 
     def set_signing_key(self, signing_key: str) -> None:
         """Create secret with signing key content.
@@ -391,8 +515,8 @@ class SynapseCharm(CharmBaseWithState):
         Args:
             signing_key: signing key as string.
         """
-        peer_relation = self.model.relations[synapse.SYNAPSE_PEER_RELATION_NAME]
-        if not peer_relation:
+        peer_relation = self._peer_relation
+        if peer_relation is None:
             logger.error(
                 "Failed to set signing key: no peer relation %s found",
                 synapse.SYNAPSE_PEER_RELATION_NAME,
@@ -403,11 +527,10 @@ class SynapseCharm(CharmBaseWithState):
             logger.info("Received signing key but there is no change, skipping")
             return
         if self.unit.is_leader():
-            logger.debug("Adding signing key to secret: %s", signing_key)
             secret = self.app.add_secret({"secret-signing-key": signing_key})
-            peer_relation[0].data[self.app].update(
-                {"secret-signing-id": typing.cast(str, secret.id)}
-            )
+            logger.debug("Signing key added to secret %s", secret.id)
+            peer_relation.data[self.app].update({"secret-signing-id": typing.cast(str, secret.id)})
+            self._signing_key_cache = _UNSET
 
     def get_signing_key(self) -> typing.Optional[str]:
         """Get signing key from secret.
@@ -415,24 +538,28 @@ class SynapseCharm(CharmBaseWithState):
         Returns:
             Signing key as string or None if not found.
         """
-        peer_relation = self.model.relations[synapse.SYNAPSE_PEER_RELATION_NAME]
-        if not peer_relation:
+        if self._signing_key_cache is not _UNSET:
+            return typing.cast(typing.Optional[str], self._signing_key_cache)
+        peer_relation = self._peer_relation
+        if peer_relation is None:
             logger.error(
                 "Failed to get signing key: no peer relation %s found",
                 synapse.SYNAPSE_PEER_RELATION_NAME,
             )
             return None
 
-        secret_id = peer_relation[0].data[self.app].get("secret-signing-id")
+        signing_key = None
+        secret_id = peer_relation.data[self.app].get("secret-signing-id")
         if secret_id:
             try:
                 secret = self.model.get_secret(id=secret_id)
-                logging.debug(secret.get_content().get("secret-signing-key"))
-                return secret.get_content().get("secret-signing-key")
+                signing_key = secret.get_content().get("secret-signing-key")
+                logger.debug("Signing key found in secret %s", secret_id)
             except (ops.model.SecretNotFoundError, ValueError, TypeError) as exc:
                 logger.exception("Failed to get secret id %s: %s", secret_id, str(exc))
-                del peer_relation[0].data[self.app]["secret-signing-id"]
-        return None
+                del peer_relation.data[self.app]["secret-signing-id"]
+        self._signing_key_cache = signing_key
+        return signing_key
 
     @inject_charm_state
     def _on_leader_elected(self, _: ops.HookEvent, charm_state: CharmState) -> None:
@@ -485,7 +612,7 @@ class SynapseCharm(CharmBaseWithState):
         Args:
             event: Event triggering the register user instance action.
         """
-        container = self.unit.get_container(synapse.SYNAPSE_CONTAINER_NAME)
+        container = self.container
         if not container.can_connect():
             event.fail("Failed to connect to the container")
             return
@@ -510,7 +637,7 @@ class SynapseCharm(CharmBaseWithState):
         results = {
             "promote-user-admin": False,
         }
-        container = self.unit.get_container(synapse.SYNAPSE_CONTAINER_NAME)
+        container = self.container
         if not container.can_connect():
             event.fail("Failed to connect to the container")
             return
@@ -542,7 +669,7 @@ class SynapseCharm(CharmBaseWithState):
         results = {
             "anonymize-user": False,
         }
-        container = self.unit.get_container(synapse.SYNAPSE_CONTAINER_NAME)
+        container = self.container
         if not container.can_connect():
             event.fail("Container not yet ready. Try again later")
             return
@@ -37,6 +37,8 @@ logger = logging.getLogger(__name__)
 class CharmBaseWithState(ops.CharmBase, ABC):
     """CharmBase than can build a CharmState."""
 
+    _cached_event_path: typing.Optional[str] = None
+
     @abstractmethod
     def build_charm_state(self) -> "CharmState":
         """Build charm state."""
@@ -49,6 +51,13 @@ class CharmBaseWithState(ops.CharmBase, ABC):
         """
         return self
 
+    def reset_caches(self) -> None:
+        """Drop values memoized while handling a previous event.
+
+        Called before building the charm state for a new event, values are shared
+        between the observers of the same event.
+        """
+
     @abstractmethod
     def reconcile(self, charm_state: "CharmState") -> None:
         """Reconcile Synapse configuration.
@@ -106,6 +115,9 @@ def inject_charm_state(  # pylint: disable=protected-access
             The value returned from the original function. That is, None.
         """
         charm = instance.get_charm()
+        if charm._cached_event_path != event.handle.path:
+            charm._cached_event_path = event.handle.path
+            charm.reset_caches()
 
         try:
             charm_state = charm.build_charm_state()
@@ -35,6 +35,8 @@ def test_anonymize_user_action(harness: Harness, monkeypatch: pytest.MonkeyPatch
     user = "username"
     admin = True
     event = unittest.mock.MagicMock(spec=ActionEvent)
+    # handle is an instance attribute so it is not part of the spec
+    event.handle = unittest.mock.MagicMock()
     event.params = {
         "username": user,
         "admin": admin,
@@ -69,6 +71,8 @@ def test_anonymize_user_api_error(harness: Harness, monkeypatch: pytest.MonkeyPa
         unittest.mock.MagicMock(return_value=admin_access_token),
     )
     event = unittest.mock.MagicMock(spec=ActionEvent)
+    # handle is an instance attribute so it is not part of the spec
+    event.handle = unittest.mock.MagicMock()
     event.params = {
         "username": user,
         "admin": admin,
@@ -376,6 +376,61 @@ def test_nginx_replan_sets_status_to_active(harness: Harness) -> None:
     assert harness.model.unit.status == ops.ActiveStatus()
 
 
+def test_reconcile_skipped_when_nothing_changed(
+    harness: Harness, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    arrange: start the Synapse charm with services running and reconcile it once.
+    act: reconcile again with the same charm state while handling the same event.
+    assert: Synapse configuration is not reconciled again.
+    """
+    harness.begin_with_initial_hooks()
+    charm_state = harness.charm.build_charm_state()
+    harness.charm.reconcile(charm_state)
+    pebble_reconcile_mock = MagicMock()
+    monkeypatch.setattr(pebble, "reconcile", pebble_reconcile_mock)
+
+    harness.charm.reconcile(charm_state)
+
+    pebble_reconcile_mock.assert_not_called()
+    assert isinstance(harness.model.unit.status, ops.ActiveStatus)
+
+
+def test_reconcile_after_invalid_config_sets_active(harness: Harness) -> None:
+    """
+    arrange: start the Synapse charm and make the configuration invalid.
+    act: restore the original configuration.
+    assert: the unit goes back to Active.
+    """
+    harness.begin_with_initial_hooks()
+    harness.update_config({"server_name": ""})
+    assert isinstance(harness.model.unit.status, ops.BlockedStatus)
+
+    harness.update_config({"server_name": TEST_SERVER_NAME})
+
+    assert isinstance(harness.model.unit.status, ops.ActiveStatus)
+
+
+def test_nginx_not_restarted_when_main_unit_unchanged(
+    harness: Harness, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    arrange: start the Synapse charm with NGINX running.
+    act: change the configuration without changing the main unit.
+    assert: Synapse is reconciled but NGINX is not restarted.
+    """
+    harness.begin_with_initial_hooks()
+    restart_nginx_mock = MagicMock()
+    monkeypatch.setattr(pebble, "restart_nginx", restart_nginx_mock)
+    pebble_reconcile_mock = MagicMock()
+    monkeypatch.setattr(pebble, "reconcile", pebble_reconcile_mock)
+
+    harness.update_config({"enable_password_config": False})
+
+    pebble_reconcile_mock.assert_called_once()
+    restart_nginx_mock.assert_not_called()
+
+
 def test_redis_relation_success(redis_configured: Harness, monkeypatch: pytest.MonkeyPatch):
     """
     arrange: start the Synapse charm, set server_name, mock synapse.enable_redis.
@@ -397,6 +397,30 @@ def test_scaling_signing_key_found(harness: Harness, monkeypatch: pytest.MonkeyP
     )
 
 
+def test_scaling_signing_key_unchanged_not_pushed(
+    harness: Harness, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    arrange: charm deployed and set as main, the container already has the signing key.
+    act: emit config changed.
+    assert: Signing key secret is found and is not pushed again.
+    """
+    harness.begin_with_initial_hooks()
+    container = harness.model.unit.containers[synapse.SYNAPSE_CONTAINER_NAME]
+    signing_key_path = f"/data/{TEST_SERVER_NAME}.signing.key"
+    signing_key = container.pull(signing_key_path).read()
+    monkeypatch.setattr(harness.charm, "get_signing_key", MagicMock(return_value=signing_key))
+    push_mock = MagicMock()
+    monkeypatch.setattr(container, "push", push_mock)
+    monkeypatch.setattr(pebble, "reconcile", MagicMock())
+
+    harness.charm.on.config_changed.emit()
+
+    assert call(signing_key_path, ANY, make_dirs=True, encoding="utf-8") not in (
+        push_mock.call_args_list
+    )
+
+
 def test_scaling_signing_not_found(harness: Harness, monkeypatch: pytest.MonkeyPatch) -> None:
     """
     arrange: charm deployed, integrated with Redis and set as main.
@@ -606,3 +630,43 @@ def test_scaling_instance_map_configured_ignoring_workers(
         content = yaml.safe_load(config_file)
         assert "instance_map" in content
         assert content["instance_map"] == instance_map_content
+
+
+def test_main_unit_cache_reset_on_set_main_unit(harness: Harness) -> None:
+    """
+    arrange: charm deployed with a main unit set in the peer relation.
+    act: get main unit address, then set a different main unit.
+    assert: the memoized main unit address is refreshed after setting the main unit.
+    """
+    harness.add_relation(
+        synapse.SYNAPSE_PEER_RELATION_NAME,
+        "synapse",
+        app_data={"main_unit_id": "synapse/0"},
+    )
+    harness.begin()
+    harness.set_leader(True)
+    assert harness.charm.get_main_unit_address() == "synapse-0.synapse-endpoints"
+
+    harness.charm.set_main_unit("synapse/1")
+
+    assert harness.charm.get_main_unit() == "synapse/1"
+    assert harness.charm.get_main_unit_address() == "synapse-1.synapse-endpoints"
+
+
+def test_signing_key_secret_read_once(harness: Harness, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    arrange: charm deployed as leader with a signing key stored in a secret.
+    act: get the signing key twice.
+    assert: the secret is read only once.
+    """
+    harness.add_relation(synapse.SYNAPSE_PEER_RELATION_NAME, "synapse")
+    harness.begin()
+    harness.set_leader(True)
+    signing_key = "ed25519 a_ONyE 5YwXqh43qXKrwQa/9Vcjog66xYliBUzotClQ5SUt9tk"
+    harness.charm.set_signing_key(signing_key)
+    get_secret_spy = MagicMock(wraps=harness.charm.model.get_secret)
+    monkeypatch.setattr(harness.charm.model, "get_secret", get_secret_spy)
+
+    assert harness.charm.get_signing_key() == signing_key
+    assert harness.charm.get_signing_key() == signing_key
+    get_secret_spy.assert_called_once()
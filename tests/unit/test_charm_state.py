@@ -131,6 +131,57 @@ def test_inject_charm_state_in_observer_correct() -> None:
     assert isinstance(observer.charm_state, CharmState)
 
 
+def test_inject_charm_state_reset_caches_once_per_event() -> None:
+    """
+    arrange: Create a charm that counts cache resets and observes install twice.
+    act: Emit install event twice.
+    assert: Caches are reset once for each emitted event, not for each observer.
+    """
+
+    class FakeCharm(SimpleCharm):
+        """Fake charm counting cache resets."""
+
+        def __init__(self, *args):
+            """Init method.
+
+            Args:
+                args: Charm arguments.
+            """
+            super().__init__(*args)
+            self.resets = 0
+            self.framework.observe(self.on.install, self._on_install)
+            self.framework.observe(self.on.install, self._on_install_again)
+
+        def reset_caches(self) -> None:
+            """Count cache resets."""
+            self.resets += 1
+
+        @inject_charm_state
+        def _on_install(self, _: ops.InstallEvent, charm_state: CharmState):
+            """Event handler for on_install.
+
+            Args:
+                charm_state: Injected CharmState
+            """
+
+        @inject_charm_state
+        def _on_install_again(self, _: ops.InstallEvent, charm_state: CharmState):
+            """Second event handler for on_install.
+
+            Args:
+                charm_state: Injected CharmState
+            """
+
+    harness = Harness(FakeCharm)
+    harness.begin()
+    charm = harness.charm
+
+    charm.on.install.emit()
+    charm.on.install.emit()
+
+    assert charm.resets == 2
+
+
 def test_inject_charm_state_hook_failed() -> None:
     """
     arrange: Create a charm and that gets charm_state injected on start and stores
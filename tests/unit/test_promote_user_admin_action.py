@@ -33,6 +33,8 @@ def test_promote_user_admin_action(harness: Harness, monkeypatch: pytest.MonkeyP
     monkeypatch.setattr("synapse.promote_user_admin", promote_user_admin_mock)
     user = "username"
     event = unittest.mock.MagicMock(spec=ActionEvent)
+    # handle is an instance attribute so it is not part of the spec
+    event.handle = unittest.mock.MagicMock()
     event.params = {
         "username": user,
     }
@@ -65,6 +67,8 @@ def test_promote_user_admin_api_error(harness: Harness, monkeypatch: pytest.Monk
     )
     user = "username"
     event = unittest.mock.MagicMock(spec=ActionEvent)
+    # handle is an instance attribute so it is not part of the spec
+    event.handle = unittest.mock.MagicMock()
     event.params = {
         "username": user,
     }